@@ -0,0 +1,175 @@
+"""
+Batch Completion Module
+
+Runs many independent structured completions through a provider batch API
+(OpenAI-compatible /v1/chat/completions batches, submitted via litellm).
+Batches trade minutes-to-hours of turnaround for roughly half the per-token
+cost, so they are only worth using for offline generation runs.
+"""
+
+import json
+import time
+from typing import Dict, List, Optional, Tuple, Type
+
+import litellm
+from all_the_llms import LLM
+from pydantic import BaseModel, ValidationError
+
+from src.response_cache import CachedLLM
+
+# (messages, response_model) for a single structured completion
+BatchRequest = Tuple[List[dict], Type[BaseModel]]
+
+
+class BatchRunner:
+    """
+    Submits structured completion requests as a single provider batch.
+
+    Attributes:
+        llm: LLM whose resolved model serves every request; also used as the
+            synchronous fallback for requests the batch could not answer
+        custom_llm_provider: litellm provider hosting the batch
+        poll_interval: Seconds to wait between batch status checks
+    """
+
+    def __init__(self, llm: LLM, custom_llm_provider: str = "openai", poll_interval: float = 60.0):
+        self.llm = llm
+        self.custom_llm_provider = custom_llm_provider
+        self.poll_interval = poll_interval
+
+        # Model id as the provider expects it inside a batch request body
+        try:
+            self._batch_model, model_provider, _, _ = litellm.get_llm_provider(llm.model_name)
+        except litellm.exceptions.BadRequestError:
+            model_provider = None
+        if model_provider != custom_llm_provider:
+            raise ValueError(
+                f"Batch mode needs a model hosted by '{custom_llm_provider}', but "
+                f"{llm.model_name} is served by {model_provider or 'an unknown provider'}"
+            )
+
+    def structured_completions(self, requests: Dict[str, BatchRequest]) -> Dict[str, BaseModel]:
+        """
+        Run every request in one batch and validate the responses.
+
+        If llm is a CachedLLM, cached responses are used without submitting
+        them, and responses from the batch are added to the cache.
+
+        Args:
+            requests: Maps a caller-chosen custom_id to its (messages, response_model)
+
+        Returns:
+            Dict mapping each custom_id to a validated response_model instance.
+            Requests that errored or failed validation inside the batch are
+            retried synchronously, so every custom_id is present.
+        """
+        cache = self.llm if isinstance(self.llm, CachedLLM) else None
+
+        results = {}
+        if cache is not None:
+            for custom_id, (messages, response_model) in requests.items():
+                cached = cache.lookup(messages, response_model)
+                if cached is not None:
+                    results[custom_id] = cached
+
+        pending = {k: v for k, v in requests.items() if k not in results}
+        if pending:
+            batch_id = self._submit(pending)
+            output_file_id = self._wait(batch_id)
+            batch_results = self._collect(output_file_id, pending)
+            if cache is not None:
+                for custom_id, response in batch_results.items():
+                    messages, response_model = pending[custom_id]
+                    cache.store(messages, response_model, response)
+            results.update(batch_results)
+
+        for custom_id, (messages, response_model) in requests.items():
+            if custom_id not in results:
+                results[custom_id] = self.llm.structured_completion(
+                    messages=messages,
+                    response_model=response_model,
+                )
+
+        return results
+
+    def _submit(self, requests: Dict[str, BatchRequest]) -> str:
+        """Upload the requests as a JSONL file and create a batch from it."""
+        lines = []
+        for custom_id, (messages, response_model) in requests.items():
+            lines.append(json.dumps({
+                "custom_id": custom_id,
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": {
+                    "model": self._batch_model,
+                    "messages": messages,
+                    "response_format": {
+                        "type": "json_schema",
+                        "json_schema": {
+                            "name": response_model.__name__,
+                            "schema": response_model.model_json_schema(),
+                        },
+                    },
+                },
+            }, ensure_ascii=False))
+        payload = ("\n".join(lines) + "\n").encode("utf-8")
+
+        input_file = litellm.create_file(
+            file=("batch_requests.jsonl", payload),
+            purpose="batch",
+            custom_llm_provider=self.custom_llm_provider,
+        )
+        batch = litellm.create_batch(
+            completion_window="24h",
+            endpoint="/v1/chat/completions",
+            input_file_id=input_file.id,
+            custom_llm_provider=self.custom_llm_provider,
+        )
+        return batch.id
+
+    def _wait(self, batch_id: str) -> Optional[str]:
+        """
+        Poll until the batch finishes and return its output file id, or None
+        if no request succeeded (their errors are only in the error file).
+        """
+        while True:
+            batch = litellm.retrieve_batch(
+                batch_id=batch_id,
+                custom_llm_provider=self.custom_llm_provider,
+            )
+            if batch.status == "completed":
+                if batch.error_file_id:
+                    print(f"[Warning] Batch {batch_id} had failed requests, see error file {batch.error_file_id}")
+                return batch.output_file_id
+            if batch.status in ("failed", "expired", "cancelled"):
+                raise RuntimeError(f"Batch {batch_id} ended with status '{batch.status}'")
+            time.sleep(self.poll_interval)
+
+    def _collect(self, output_file_id: Optional[str], requests: Dict[str, BatchRequest]) -> Dict[str, BaseModel]:
+        """Download the batch output and validate each successful response."""
+        if output_file_id is None:
+            return {}
+
+        content = litellm.file_content(
+            file_id=output_file_id,
+            custom_llm_provider=self.custom_llm_provider,
+        )
+
+        results = {}
+        for line in content.text.splitlines():
+            if not line.strip():
+                continue
+            item = json.loads(line)
+            custom_id = item.get("custom_id")
+            if custom_id not in requests or item.get("error"):
+                continue
+
+            _, response_model = requests[custom_id]
+            try:
+                body = item["response"]["body"]
+                message = body["choices"][0]["message"]["content"]
+                results[custom_id] = response_model.model_validate_json(message)
+            except (KeyError, IndexError, TypeError, ValidationError) as e:
+                print(f"[Warning] Batch response for {custom_id} unusable, retrying synchronously: {e}")
+
+        return results
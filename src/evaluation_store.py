@@ -4,18 +4,56 @@ Evaluation Store Module
 Manages user evaluation sessions with lightweight tracking.
 The CaseRecord is the source of truth for evaluation data.
 This store only tracks which cases each user has reviewed.
+
+Each session is stored as two files:
+  - session_<username>.meta.json: session metadata, rewritten only when a
+    session is loaded or created
+  - session_<username>.jsonl: append-only log with one line per reviewed case
+
+A local _index.json summarizes every session so list_all_sessions doesn't
+have to open each one. It is a cache: entries whose session files changed
+since they were written (e.g. after a git pull) are refreshed on read.
+
+Sessions in the older single-file format (session_<username>.json) are
+converted to the two-file format the first time they are loaded.
 """
 
-import json
+import mmap
 import os
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Dict, List, Optional, Any
+from typing import Dict, Iterator, List, Optional, Any, Set, Tuple, Union
 from datetime import datetime
 import re
 
+import orjson
+
 from src.response_models.case import BenchmarkCandidate
 from src.response_models.human_evaluation import CaseEvaluation, UserSession
 
+META_SUFFIX = ".meta.json"
+LOG_SUFFIX = ".jsonl"
+LEGACY_SUFFIX = ".json"  # Single-file sessions written by earlier versions
+
+INDEX_FILENAME = "_index.json"
+
+# UserSession fields stored in the metadata file; the rest come from the log
+SESSION_META_FIELDS = {"username", "session_id", "started_at", "last_updated"}
+
+_USERNAME_RE = re.compile(r'^[a-z]+$')
+
+
+@contextmanager
+def _mapped_file(path: Path) -> Iterator[Union[mmap.mmap, bytes]]:
+    """Memory-map a file read-only, so it can be parsed without copying it."""
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            # Empty files can't be mapped
+            yield b""
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            yield mm
+
 
 class EvaluationStore:
     """
@@ -45,10 +83,10 @@ class EvaluationStore:
         # Username should already be lowercase letters only, but ensure it's safe
         return username.lower()
     
-    def _get_session_file_path(self, username: str) -> Path:
-        """Get the file path for a user's session."""
+    def _get_session_file_path(self, username: str, suffix: str = META_SUFFIX) -> Path:
+        """Get the file path for one of a user's session files."""
         safe_username = self._sanitize_username(username)
-        return self.evaluations_dir / f"session_{safe_username}.json"
+        return self.evaluations_dir / f"session_{safe_username}{suffix}"
     
     def load_or_create_session(self, username: str) -> UserSession:
         """
@@ -64,9 +102,13 @@ class EvaluationStore:
             raise ValueError(f"Invalid username format: {username}. Username must contain only lowercase letters.")
         
         session_file = self._get_session_file_path(username)
+        legacy_file = self._get_session_file_path(username, LEGACY_SUFFIX)
         
-        if session_file.exists():
-            session = self._load_session_from_file(session_file)
+        if session_file.exists() or legacy_file.exists():
+            if session_file.exists():
+                session = self._load_session_from_file(session_file, compact=True)
+            else:
+                session = self._migrate_legacy_session(legacy_file)
             session.last_updated = datetime.now().isoformat()
             print(f"✓ Loaded existing session for {username}")
             print(f"  - {len(session.reviewed_case_ids)} cases previously reviewed")
@@ -75,12 +117,12 @@ class EvaluationStore:
             print(f"✓ Created new session for {username}")
         
         self.current_session = session
+        self.save_session()
         return session
     
     def _validate_username(self, username: str) -> bool:
         """Validate username contains only lowercase letters."""
-        pattern = r'^[a-z]+$'
-        return re.match(pattern, username) is not None
+        return _USERNAME_RE.match(username) is not None
     
     def _create_new_session(self, username: str) -> UserSession:
         """Create a new user session."""
@@ -95,22 +137,185 @@ class EvaluationStore:
             reviewed_case_ids=set()
         )
     
-    def _load_session_from_file(self, file_path: Path) -> UserSession:
-        """Load a session from JSON file."""
-        with open(file_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+    def _load_session_from_file(self, file_path: Path, compact: bool = False) -> UserSession:
+        """
+        Load a session from its metadata file and review log.
         
-        return UserSession(
-            username=data['username'],
-            session_id=data['session_id'],
-            started_at=data['started_at'],
-            last_updated=data['last_updated'],
-            reviewed_case_ids=set(data.get('reviewed_case_ids', []))
+        Args:
+            file_path: Path to the session metadata file
+            compact: If True, rewrite the review log when it has accumulated
+                more than twice as many events as unique case IDs
+        """
+        with open(file_path, 'rb') as f:
+            session = UserSession.model_validate_json(f.read())
+        
+        log_file = self._get_session_file_path(session.username, LOG_SUFFIX)
+        reviewed_case_ids, review_outcomes, review_timestamps, num_events, last_event_at = (
+            self._read_review_log(log_file)
         )
+        
+        session.reviewed_case_ids = reviewed_case_ids
+        session.review_outcomes = review_outcomes
+        session.review_timestamps = review_timestamps
+        session.last_updated = max(session.last_updated, last_event_at or "")
+        self._tally_review_outcomes(session)
+        
+        if compact and num_events > 2 * len(reviewed_case_ids):
+            self._compact_review_log(session)
+        
+        return session
+    
+    def _load_legacy_session(self, file_path: Path) -> UserSession:
+        """Load a session from a single-file JSON session."""
+        with open(file_path, 'rb') as f:
+            return UserSession.model_validate_json(f.read())
+    
+    def _migrate_legacy_session(self, file_path: Path) -> UserSession:
+        """
+        Convert a single-file JSON session into metadata + review log files.
+        
+        The legacy file is left in place, since session files are shared
+        through git; once the metadata file exists it takes precedence.
+        """
+        session = self._load_legacy_session(file_path)
+        # The legacy format has no per-case times; its last_updated is the
+        # closest known time for every review. Record it now, before
+        # save_session moves last_updated to the current time.
+        session.review_timestamps = dict.fromkeys(session.reviewed_case_ids, session.last_updated)
+        self._compact_review_log(session)
+        self.save_session(session)
+        print(f"✓ Converted {file_path.name} to {self._get_session_file_path(session.username).name} "
+              f"and {self._get_session_file_path(session.username, LOG_SUFFIX).name}; commit them with your reviews")
+        return session
+    
+    def _read_review_log(
+        self, log_file: Path
+    ) -> Tuple[Set[str], Dict[str, Dict[str, Any]], Dict[str, str], int, Optional[str]]:
+        """
+        Read a session's append-only review log.
+        
+        Returns:
+            Tuple of (reviewed case IDs, known review outcomes by case ID,
+            latest review timestamp by case ID, number of events, latest
+            event timestamp)
+        """
+        reviewed_case_ids: Set[str] = set()
+        review_outcomes: Dict[str, Dict[str, Any]] = {}
+        review_timestamps: Dict[str, str] = {}
+        num_events = 0
+        last_event_at = None
+        
+        for event in self._iter_review_log(log_file):
+            reviewed_case_ids.add(event['case_id'])
+            if 'decision' in event:
+                review_outcomes[event['case_id']] = {
+                    'decision': event['decision'],
+                    'has_edits': event.get('has_edits', False)
+                }
+            if 'ts' in event:
+                review_timestamps[event['case_id']] = max(
+                    review_timestamps.get(event['case_id'], ""), event['ts']
+                )
+                last_event_at = max(last_event_at or "", event['ts'])
+            num_events += 1
+        
+        return reviewed_case_ids, review_outcomes, review_timestamps, num_events, last_event_at
+    
+    def _iter_review_log(self, log_file: Path) -> Iterator[Dict[str, Any]]:
+        """
+        Yield the events in a session's review log, skipping blank lines
+        and warning about malformed ones.
+        
+        The log is memory-mapped and its lines are sliced without copying.
+        A well-formed log is parsed in a single orjson call.
+        """
+        if not log_file.exists():
+            return
+        
+        with _mapped_file(log_file) as data, memoryview(data) as view:
+            lines = []
+            try:
+                start = 0
+                while start < len(data):
+                    end = data.find(b"\n", start)
+                    if end == -1:
+                        end = len(data)
+                    if end > start:
+                        lines.append(view[start:end])
+                    start = end + 1
+                
+                try:
+                    # Parse the whole log in a single orjson call
+                    events = orjson.loads(b"[" + b",".join(lines) + b"]")
+                except orjson.JSONDecodeError:
+                    events = []
+                    for line in lines:
+                        try:
+                            events.append(orjson.loads(line))
+                        except orjson.JSONDecodeError:
+                            if bytes(line).strip():
+                                # A partially written line from an interrupted append
+                                print(f"Warning: Skipping malformed line in {log_file.name}")
+            finally:
+                # The mapping can't be closed while slices of it are alive
+                for line in lines:
+                    line.release()
+        
+        yield from events
+    
+    def _tally_review_outcomes(self, session: UserSession) -> None:
+        """Recompute a session's statistics counters from its known review outcomes."""
+        outcomes = session.review_outcomes.values()
+        session.approved = sum(1 for o in outcomes if o['decision'] == 'approve')
+        session.rejected = sum(1 for o in outcomes if o['decision'] == 'reject')
+        session.with_edits = sum(1 for o in outcomes if o['has_edits'])
+    
+    def _append_review_event(
+        self,
+        session: UserSession,
+        case_id: str,
+        timestamp: str,
+        outcome: Dict[str, Any]
+    ) -> None:
+        """Append a single reviewed-case event to the session's review log."""
+        log_file = self._get_session_file_path(session.username, LOG_SUFFIX)
+        event = {'case_id': case_id, 'ts': timestamp, **outcome}
+        
+        with open(log_file, 'a+b') as f:
+            # An interrupted append can leave a torn last line without its
+            # newline; terminate it so this event isn't merged into it
+            if f.seek(0, os.SEEK_END) > 0:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    f.write(b"\n")
+            f.write(orjson.dumps(event, option=orjson.OPT_APPEND_NEWLINE))
+    
+    def _compact_review_log(self, session: UserSession) -> None:
+        """
+        Rewrite the review log with exactly one event per reviewed case,
+        keeping each case's latest review time. Cases without a recorded
+        time get the session's last_updated.
+        """
+        log_file = self._get_session_file_path(session.username, LOG_SUFFIX)
+        tmp_file = log_file.with_name(log_file.name + ".tmp")
+        
+        with open(tmp_file, 'wb') as f:
+            for case_id in sorted(session.reviewed_case_ids):
+                event = {
+                    'case_id': case_id,
+                    'ts': session.review_timestamps.get(case_id, session.last_updated),
+                    **session.review_outcomes.get(case_id, {})
+                }
+                f.write(orjson.dumps(event, option=orjson.OPT_APPEND_NEWLINE))
+        
+        os.replace(tmp_file, log_file)
     
     def save_session(self, session: Optional[UserSession] = None) -> None:
         """
-        Save the current or specified session to disk.
+        Save the current or specified session's metadata to disk.
+        
+        Reviewed case IDs are not rewritten here; they are appended to the
+        review log as each evaluation is recorded.
         
         Args:
             session: Session to save (defaults to current_session)
@@ -124,17 +329,10 @@ class EvaluationStore:
         session.last_updated = datetime.now().isoformat()
         session_file = self._get_session_file_path(session.username)
         
-        # Convert to dict for JSON serialization
-        session_dict = {
-            'username': session.username,
-            'session_id': session.session_id,
-            'started_at': session.started_at,
-            'last_updated': session.last_updated,
-            'reviewed_case_ids': list(session.reviewed_case_ids)
-        }
-        
         with open(session_file, 'w', encoding='utf-8') as f:
-            json.dump(session_dict, f, indent=2, ensure_ascii=False)
+            f.write(session.model_dump_json(include=SESSION_META_FIELDS, indent=2))
+        
+        self._update_index(session)
     
     def record_evaluation(
         self,
@@ -142,7 +340,8 @@ class EvaluationStore:
         decision: str,
         case_loader,  # CaseLoader instance
         updated_case: Optional[BenchmarkCandidate] = None,
-        notes: Optional[str] = None
+        notes: Optional[str] = None,
+        timestamp: Optional[str] = None
     ) -> None:
         """
         Record a case evaluation by updating the CaseRecord and tracking in session.
@@ -153,6 +352,9 @@ class EvaluationStore:
             case_loader: CaseLoader instance to load/save case records
             updated_case: Optional edited BenchmarkCandidate
             notes: Optional evaluation notes
+            timestamp: ISO timestamp recorded as the case record's
+                evaluated_at and in the session log (defaults to now);
+                callers recording a batch can pass one shared value
             
         Raises:
             ValueError: If no active session or invalid decision
@@ -169,25 +371,43 @@ class EvaluationStore:
         if not case_record:
             raise RuntimeError(f"Case {case_id} not found")
         
+        now = timestamp or datetime.now().isoformat()
+        
         try:
             # Add evaluation to the case record
             case_record.add_human_evaluation(
                 decision=decision,
                 evaluator=self.current_session.username,
                 updated_case=updated_case,
-                notes=notes
+                notes=notes,
+                timestamp=now
             )
             
             # Save the updated case record
             case_loader.save_case(case_record)
             
-            # Track in session (lightweight)
+            # Track in session (lightweight, append-only)
+            outcome = {'decision': decision, 'has_edits': updated_case is not None}
+            self._append_review_event(self.current_session, case_id, now, outcome)
             self.current_session.reviewed_case_ids.add(case_id)
-            self.save_session()
+            self.current_session.review_outcomes[case_id] = outcome
+            self.current_session.review_timestamps[case_id] = now
+            self.current_session.last_updated = now
+            
+            # Keep statistics counters current so get_statistics needs no disk reads
+            if decision == 'approve':
+                self.current_session.approved += 1
+            else:
+                self.current_session.rejected += 1
+            if outcome['has_edits']:
+                self.current_session.with_edits += 1
             
         except Exception as e:
-            # If anything fails, don't track in session
+            # The case record or review log couldn't be written, so the
+            # session doesn't track this case
             raise RuntimeError(f"Failed to record evaluation: {e}")
+        
+        self._update_index(self.current_session)
     
     def has_reviewed(self, case_id: str) -> bool:
         """Check if a case has been reviewed in the current session."""
@@ -215,17 +435,13 @@ class EvaluationStore:
             return None
         
         # Reconstruct evaluation from case record
-        # Find the original (pre-evaluation) case by looking for the last non-evaluation iteration
         eval_iteration = eval_data['iteration']
         original_case = None
         
-        # Look backwards from the evaluation iteration to find the last non-evaluation case
-        for i in range(eval_iteration - 1, -1, -1):
-            if i < len(case_record.refinement_history):
-                iteration_record = case_record.refinement_history[i]
-                if iteration_record.step_description != "human_evaluation":
-                    original_case = iteration_record.data
-                    break
+        # The original (pre-evaluation) case is the last non-evaluation iteration
+        pre_evaluation_index = case_record.get_pre_evaluation_index(eval_data)
+        if pre_evaluation_index is not None:
+            original_case = case_record.refinement_history[pre_evaluation_index].data
         
         # If no pre-evaluation case found, use the first iteration
         if original_case is None and len(case_record.refinement_history) > 0:
@@ -259,7 +475,7 @@ class EvaluationStore:
         Returns:
             List of unreviewed case IDs
         """
-        if self.current_session is None:
+        if self.current_session is None or not self.current_session.reviewed_case_ids:
             return all_case_ids
         
         return [cid for cid in all_case_ids if cid not in self.current_session.reviewed_case_ids]
@@ -268,8 +484,11 @@ class EvaluationStore:
         """
         Get evaluation statistics for the current session.
         
+        Counters are maintained as evaluations are recorded, so case records
+        are only loaded for reviews whose outcome isn't in the session log.
+        
         Args:
-            case_loader: CaseLoader instance to load case records
+            case_loader: CaseLoader instance to backfill missing outcomes
             
         Returns:
             Dictionary with statistics
@@ -282,47 +501,149 @@ class EvaluationStore:
                 "with_edits": 0
             }
         
-        approved = 0
-        rejected = 0
-        with_edits = 0
+        session = self.current_session
+        
+        # Sessions migrated from the single-file format only know which cases
+        # were reviewed; backfill their outcomes from the case records once.
+        if len(session.review_outcomes) < len(session.reviewed_case_ids):
+            self._backfill_review_outcomes(session, case_loader)
         
-        for case_id in self.current_session.reviewed_case_ids:
+        return {
+            "total_reviewed": len(session.reviewed_case_ids),
+            "approved": session.approved,
+            "rejected": session.rejected,
+            "with_edits": session.with_edits
+        }
+    
+    def _backfill_review_outcomes(self, session: UserSession, case_loader) -> None:
+        """Load outcomes missing from the review log from their case records."""
+        for case_id in session.reviewed_case_ids - session.review_outcomes.keys():
+            outcome = {'decision': None, 'has_edits': False}
             case_record = case_loader.get_case_by_id(case_id)
             if case_record:
                 eval_data = case_record.get_latest_evaluation()
                 if eval_data:
-                    if eval_data['decision'] == 'approve':
-                        approved += 1
-                    elif eval_data['decision'] == 'reject':
-                        rejected += 1
-                    if eval_data.get('has_edits'):
-                        with_edits += 1
-        
+                    outcome = {
+                        'decision': eval_data['decision'],
+                        'has_edits': bool(eval_data.get('has_edits'))
+                    }
+            session.review_outcomes[case_id] = outcome
+        
+        self._tally_review_outcomes(session)
+        self._compact_review_log(session)
+    
+    def _session_files_mtime(self, username: str) -> int:
+        """Latest modification time (ns) across a user's session files."""
+        mtimes = [
+            path.stat().st_mtime_ns
+            for path in (
+                self._get_session_file_path(username, suffix)
+                for suffix in (META_SUFFIX, LOG_SUFFIX, LEGACY_SUFFIX)
+            )
+            if path.exists()
+        ]
+        return max(mtimes, default=0)
+    
+    def _index_entry(self, session: UserSession) -> Dict[str, Any]:
+        """Build the index entry summarizing a session."""
         return {
-            "total_reviewed": len(self.current_session.reviewed_case_ids),
-            "approved": approved,
-            "rejected": rejected,
-            "with_edits": with_edits
+            'username': session.username,
+            'session_id': session.session_id,
+            'started_at': session.started_at,
+            'last_updated': session.last_updated,
+            'num_evaluations': len(session.reviewed_case_ids),
+            'mtime_ns': self._session_files_mtime(session.username)
         }
     
+    def _load_index(self) -> Dict[str, Dict[str, Any]]:
+        """Load the session index, or an empty one if it is missing or corrupt."""
+        index_file = self.evaluations_dir / INDEX_FILENAME
+        if not index_file.exists():
+            return {}
+        
+        try:
+            with _mapped_file(index_file) as data, memoryview(data) as view:
+                index = orjson.loads(view)
+            if not isinstance(index, dict):
+                raise ValueError("expected a JSON object")
+            return index
+        except ValueError as e:  # Includes orjson.JSONDecodeError
+            print(f"Warning: Rebuilding corrupt {INDEX_FILENAME}: {e}")
+            return {}
+    
+    def _write_index(self, index: Dict[str, Dict[str, Any]]) -> None:
+        """Atomically replace the session index."""
+        index_file = self.evaluations_dir / INDEX_FILENAME
+        tmp_file = index_file.with_name(index_file.name + ".tmp")
+        
+        with open(tmp_file, 'wb') as f:
+            f.write(orjson.dumps(index, option=orjson.OPT_INDENT_2))
+        
+        os.replace(tmp_file, index_file)
+    
+    def _update_index(self, session: UserSession) -> None:
+        """
+        Record a session's current summary in the index.
+        
+        A failed write only prints a warning: the session files are already
+        saved, and list_all_sessions refreshes stale entries by mtime.
+        """
+        try:
+            index = self._load_index()
+            index[session.username] = self._index_entry(session)
+            self._write_index(index)
+        except OSError as e:
+            print(f"Warning: Could not update {INDEX_FILENAME}: {e}")
+    
     def list_all_sessions(self) -> List[Dict[str, str]]:
-        """List all available user sessions."""
-        sessions = []
+        """
+        List all available user sessions.
+        
+        Reads the session index, reloading only sessions whose files are
+        missing from it or have changed since their entry was written.
+        """
+        index = self._load_index()
+        changed = False
+        usernames = set()
         
         for session_file in self.evaluations_dir.glob("session_*.json"):
+            name = session_file.name[len("session_"):]
+            username = name[:-len(META_SUFFIX)] if name.endswith(META_SUFFIX) else name[:-len(LEGACY_SUFFIX)]
+            if username in usernames:
+                continue
+            usernames.add(username)
+            
+            entry = index.get(username)
+            if entry is not None and entry.get('mtime_ns') == self._session_files_mtime(username):
+                continue
+            
             try:
-                with open(session_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    sessions.append({
-                        'username': data.get('username', 'unknown'),
-                        'session_id': data.get('session_id', 'unknown'),
-                        'started_at': data.get('started_at', 'unknown'),
-                        'last_updated': data.get('last_updated', 'unknown'),
-                        'num_evaluations': len(data.get('reviewed_case_ids', []))
-                    })
+                meta_file = self._get_session_file_path(username)
+                if meta_file.exists():
+                    session = self._load_session_from_file(meta_file)
+                else:
+                    session = self._load_legacy_session(session_file)
+                index[username] = self._index_entry(session)
+                changed = True
             except Exception as e:
                 print(f"Warning: Could not load {session_file.name}: {e}")
         
+        for username in index.keys() - usernames:
+            del index[username]
+            changed = True
+        
+        if changed:
+            try:
+                self._write_index(index)
+            except OSError as e:
+                # The refreshed entries are still returned below
+                print(f"Warning: Could not update {INDEX_FILENAME}: {e}")
+        
+        sessions = [
+            {key: value for key, value in entry.items() if key != 'mtime_ns'}
+            for username, entry in index.items()
+            if username in usernames
+        ]
         return sorted(sessions, key=lambda x: x['last_updated'], reverse=True)
 
 
@@ -340,7 +661,12 @@ def main():
     if len(sys.argv) > 1:
         username = sys.argv[1]
     else:
-        username = input("Enter your username (lowercase letters only): ").strip()
+        try:
+            username = input("Enter your username (lowercase letters only): ").strip()
+        except EOFError:
+            # No TTY or exhausted piped input: fail instead of waiting
+            print("\n✗ Error: No username given. Pass it as an argument.", file=sys.stderr)
+            sys.exit(1)
     
     try:
         session = store.load_or_create_session(username)
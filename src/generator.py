@@ -1,3 +1,4 @@
+import asyncio
 import json
 import random
 import os
@@ -34,7 +35,10 @@ from src.prompts.components.synthetic_components import (
     VALUES_WITHIN_PAIRS,
 )
 from src.utils import *
-from src.utils import evaluate_rubric
+from src.utils import build_rubric_messages, evaluate_rubric, rubric_feedback
+from src.batch import BatchRunner
+from src.rate_limit import RateLimitedLLM
+from src.response_cache import CachedLLM
 
 def _load_random_within_patient_case(
     unified_cases_path: str = "data/seed/unified_ethics_cases.json",
@@ -61,6 +65,89 @@ def _load_random_within_patient_case(
     return chosen["case"].strip(), chosen["value_1"], chosen["value_2"]
 
 
+# (display name, rubric model, evaluator role) for each independent rubric audit
+RUBRIC_EVALUATORS = [
+    ("Clinical", ClinicalRubric, "an experienced clinician in the relevant medical field."),
+    ("Ethical", EthicalRubric, "Medical Ethics Professor specializing in principlist values"),
+    ("Stylistic", StylisticRubric, "Senior Medical Editor"),
+]
+
+
+async def run_rubrics(llm: LLM, pm: PromptManager, draft: DraftCase) -> list[tuple]:
+    """
+    Evaluate a draft against every rubric in RUBRIC_EVALUATORS concurrently.
+
+    The audits only share the draft as input, so all of them are submitted
+    before any is awaited. Results are returned in RUBRIC_EVALUATORS order as
+    (rubric, feedback) tuples.
+    """
+    tasks = [
+        asyncio.create_task(
+            asyncio.to_thread(evaluate_rubric, llm, pm, rubric_type, role_name, draft)
+        )
+        for _, rubric_type, role_name in RUBRIC_EVALUATORS
+    ]
+    return await asyncio.gather(*tasks)
+
+
+def clarify_value(
+    llm: LLM,
+    pm: PromptManager,
+    draft: DraftCase,
+    value: str,
+    tag_1: str,
+    tag_2: str,
+) -> ValueRubric:
+    """Audit how clearly a single value is expressed by the tagged choices."""
+    return llm.structured_completion(
+        messages=build_value_rubric_messages(pm, draft, value, tag_1, tag_2),
+        response_model=ValueRubric,
+    )
+
+
+def build_value_rubric_messages(
+    pm: PromptManager,
+    draft: DraftCase,
+    value: str,
+    tag_1: str,
+    tag_2: str,
+) -> list[dict]:
+    """Build the clarify_values messages for a single value."""
+    return pm.build_messages(
+        "workflows/clarify_values",
+        {
+            "role_name": "a clinical bioethicist specializing in principlist values.",
+            "rubric_criteria": format_criteria(ValueRubric),
+            "vignette": draft.vignette,
+            "choice_1": draft.choice_1,
+            "value_tag_1": tag_1,
+            "choice_2": draft.choice_2,
+            "value_tag_2": tag_2,
+            "value": value,
+        },
+    )
+
+
+async def run_value_rubrics(
+    llm: LLM,
+    pm: PromptManager,
+    draft: DraftCase,
+    value_tags: dict[str, tuple[str, str]],
+) -> dict[str, ValueRubric]:
+    """
+    Run clarify_value concurrently for every value in value_tags.
+
+    value_tags maps each value name to its (choice_1, choice_2) tags; the
+    returned dict preserves that ordering.
+    """
+    tasks = [
+        asyncio.create_task(
+            asyncio.to_thread(clarify_value, llm, pm, draft, value, tag_1, tag_2)
+        )
+        for value, (tag_1, tag_2) in value_tags.items()
+    ]
+    results = await asyncio.gather(*tasks)
+    return dict(zip(value_tags, results))
 
 
 def get_seeded_draft(
@@ -147,194 +234,326 @@ def get_seeded_draft(
         pretty_print_case(draft)
     return draft, seed_context
 
-@hydra.main(version_base=None, config_path="config", config_name="generator")
-def main(cfg: DictConfig) -> None:
-    load_dotenv()
+def start_case_record(cfg: DictConfig, draft: DraftCase, seed_context: SeedContext) -> CaseRecord:
+    """Create the CaseRecord for a new case, logging the initial seed draft."""
+    case_record = CaseRecord(
+        model_name=cfg.model_name,
+        generator_config=OmegaConf.to_container(cfg, resolve=True),
+        seed=seed_context,
+        status="in_progress"
+    )
+    case_record.refinement_history.append(IterationRecord(
+        iteration=0,
+        step_description="initial_draft",
+        data=draft
+    ))
+    return case_record
 
-    llm = LLM(cfg.model_name)
-    pm = PromptManager()
 
-    for case_num in tqdm(range(cfg.num_cases), desc="Generating cases"):
-        draft, seed_context = get_seeded_draft(
-            llm, pm, cfg.seed_mode, cfg.max_synthetic_feasibility_attempts, cfg.verbose
-        )
+def record_rubrics(cfg: DictConfig, case_record: CaseRecord, rubric_results: list[tuple]) -> bool:
+    """
+    Attach one round of rubric audits and their feedback to the latest record entry.
 
-        # Initialize the CaseRecord for record keeping
-        case_record = CaseRecord(
-            model_name=cfg.model_name,
-            generator_config=OmegaConf.to_container(cfg, resolve=True),
-            seed=seed_context,
-            status="in_progress"
-        )
+    rubric_results holds (rubric, feedback) tuples in RUBRIC_EVALUATORS order.
+    Returns True if every rubric passed, in which case there is nothing to refine.
+    """
+    (
+        (clinical_rubric, clinical_feedback),
+        (ethical_rubric, ethical_feedback),
+        (stylistic_rubric, stylistic_feedback),
+    ) = rubric_results
+    if cfg.verbose:
+        pretty_print_audit(clinical_rubric, "Clinical")
+        pretty_print_audit(ethical_rubric, "Ethical")
+        pretty_print_audit(stylistic_rubric, "Stylistic")
+
+    # Update the latest record entry with evaluations and feedback for refinement
+    latest_record = case_record.refinement_history[-1]
+    latest_record.clinical_evaluation = clinical_rubric
+    latest_record.ethical_evaluation = ethical_rubric
+    latest_record.stylistic_evaluation = stylistic_rubric
+    latest_record.feedback = {
+        "clinical": clinical_feedback,
+        "ethical": ethical_feedback,
+        "stylistic": stylistic_feedback
+    }
+
+    return all(rubric.overall_pass for rubric, _ in rubric_results)
+
+
+def refine_draft(
+    llm: LLM,
+    pm: PromptManager,
+    cfg: DictConfig,
+    case_record: CaseRecord,
+    draft: DraftCase,
+    iteration: int,
+) -> DraftCase:
+    """Refine the draft against the feedback on the latest record entry and log the result."""
+    feedback = case_record.refinement_history[-1].feedback
+    refine_prompt = pm.build_messages(
+        "workflows/refine",
+        {
+            "vignette": draft.vignette,
+            "choice_1": draft.choice_1,
+            "choice_2": draft.choice_2,
+            "clinical_feedback": feedback["clinical"],
+            "ethical_feedback": feedback["ethical"],
+            "style_feedback": feedback["stylistic"],
+        },
+    )
+    refined = llm.structured_completion(
+        messages=refine_prompt,
+        response_model=DraftCase,
+    )
 
-        # Log the initial seed draft
-        case_record.refinement_history.append(IterationRecord(
-            iteration=0,
-            step_description="initial_draft",
-            data=draft
-        ))
+    if cfg.verbose:
+        pretty_print_case(refined, f"REFINED CASE (Iter {iteration})")
 
-        # todo: embedding based diversity gate
+    # Log the refined draft as a new version
+    case_record.refinement_history.append(IterationRecord(
+        iteration=iteration,
+        step_description=f"refinement_{iteration}",
+        data=refined
+    ))
+    return refined
 
-        for i in range(cfg.refinement_iterations):
-            clinical_rubric, clinical_feedback = evaluate_rubric(
-                llm,
-                pm,
-                ClinicalRubric,
-                "an experienced clinician in the relevant medical field.",
-                draft
-            )
-            if cfg.verbose:
-                pretty_print_audit(clinical_rubric, "Clinical")
-
-            ethical_rubric, ethical_feedback = evaluate_rubric(
-                llm,
-                pm,
-                EthicalRubric,
-                "Medical Ethics Professor specializing in principlist values",
-                draft
-            )
+
+def tag_values(
+    llm: LLM,
+    pm: PromptManager,
+    cfg: DictConfig,
+    case_record: CaseRecord,
+    draft: DraftCase,
+) -> tuple[BenchmarkCandidate, dict[str, tuple[str, str]]]:
+    """
+    Tag the draft's choices with values and log the tagged case.
+
+    Returns the tagged case and the (choice_1, choice_2) tags of every value
+    that isn't neutral for both choices, which are the ones to clarify.
+    """
+    value_tags_prompt = pm.build_messages(
+        "workflows/tag_values",
+        {
+            "vignette": draft.vignette,
+            "choice_1": draft.choice_1,
+            "choice_2": draft.choice_2,
+        },
+    )
+
+    case_with_values = llm.structured_completion(
+        messages=value_tags_prompt,
+        response_model=BenchmarkCandidate,
+    )
+    if cfg.verbose:
+        pretty_print_case(case_with_values, "CASE WITH VALUES")
+
+    # Log the tagged case
+    case_record.refinement_history.append(IterationRecord(
+        iteration=len(case_record.refinement_history),
+        step_description="value_tagging",
+        data=case_with_values
+    ))
+
+    choice_1, choice_2 = case_with_values.choice_1, case_with_values.choice_2
+    value_tags = {
+        value: (getattr(choice_1, value), getattr(choice_2, value))
+        for value in ["autonomy", "beneficence", "nonmaleficence", "justice"]
+    }
+    value_tags = {
+        value: tags for value, tags in value_tags.items() if tags != ("neutral", "neutral")
+    }
+
+    return case_with_values, value_tags
+
+
+def finalize_case(
+    llm: LLM,
+    pm: PromptManager,
+    cfg: DictConfig,
+    case_record: CaseRecord,
+    draft: DraftCase,
+    case_with_values: BenchmarkCandidate,
+    value_validations: dict[str, ValueRubric],
+) -> None:
+    """Apply value clarification feedback, then mark the case complete and save it."""
+    value_adjustments = []
+    for value, value_rubric in value_validations.items():
+        if not value_rubric.overall_pass:
             if cfg.verbose:
-                pretty_print_audit(ethical_rubric, "Ethical")
-
-            stylistic_rubric, stylistic_feedback = evaluate_rubric(
-                llm,
-                pm,
-                StylisticRubric,
-                "Senior Medical Editor",
-                draft
+                pretty_print_audit(value_rubric, value)
+            value_adjustments.append(
+                (value, value_rubric.failing_suggested_changes)
             )
-            if cfg.verbose:
-                pretty_print_audit(stylistic_rubric, "Stylistic")
-
-            # Update the latest record entry with evaluations and feedback for refinement
-            latest_record = case_record.refinement_history[-1]
-            latest_record.clinical_evaluation = clinical_rubric
-            latest_record.ethical_evaluation = ethical_rubric
-            latest_record.stylistic_evaluation = stylistic_rubric
-            latest_record.feedback = {
-                "clinical": clinical_feedback,
-                "ethical": ethical_feedback,
-                "stylistic": stylistic_feedback
-            }
 
-            refine_prompt = pm.build_messages(
-                "workflows/refine",
-                {
-                    "old_vignette": draft.vignette,
-                    "old_choice_1": draft.choice_1,
-                    "old_choice_2": draft.choice_2,
-                    "clinical_feedback": clinical_feedback,
-                    "ethical_feedback": ethical_feedback,
-                    "style_feedback": stylistic_feedback,
-                },
-            )
-            refined = llm.structured_completion(
-                messages=refine_prompt,
-                response_model=DraftCase,
-            )
+    # Attach validations to the latest record entry
+    case_record.refinement_history[-1].value_validations = value_validations
 
-            if cfg.verbose:
-                pretty_print_case(refined, f"REFINED CASE (Iter {i+1})")
-            draft = refined
-            
-            # Log the refined draft as a new version
-            case_record.refinement_history.append(IterationRecord(
-                iteration=i + 1,
-                step_description=f"refinement_{i+1}",
-                data=draft
-            ))
-
-        value_tags_prompt = pm.build_messages(
-            "workflows/tag_values",
+    if value_adjustments:
+        value_improvements_prompt = pm.build_messages(
+            "workflows/improve_values",
             {
                 "vignette": draft.vignette,
                 "choice_1": draft.choice_1,
                 "choice_2": draft.choice_2,
+                "value_adjustments": value_adjustments,
             },
         )
-
         case_with_values = llm.structured_completion(
-            messages=value_tags_prompt,
+            messages=value_improvements_prompt,
             response_model=BenchmarkCandidate,
         )
-        if cfg.verbose:
-            pretty_print_case(case_with_values, "CASE WITH VALUES")
-
-        # Log the tagged case
+        
+        # Log the final improved version
         case_record.refinement_history.append(IterationRecord(
-            iteration=cfg.refinement_iterations + 1,
-            step_description="value_tagging",
+            iteration=len(case_record.refinement_history),
+            step_description="final_improvement",
             data=case_with_values
         ))
 
-        value_validations = {}
-        value_adjustments = []
-        for value in ["autonomy", "beneficence", "nonmaleficence", "justice"]:
-            tag_1 = case_with_values.choice_1.__dict__[value]
-            tag_2 = case_with_values.choice_2.__dict__[value]
-            if tag_1 != "neutral" or tag_2 != "neutral":
-                value_rubric_prompt = pm.build_messages(
-                    "workflows/clarify_values",
-                    {
-                        "role_name": "a clinical bioethicist specializing in principlist values.",
-                        "rubric_criteria": format_criteria(ValueRubric),
-                        "vignette": draft.vignette,
-                        "choice_1": draft.choice_1,
-                        "value_tag_1": tag_1,
-                        "choice_2": draft.choice_2,
-                        "value_tag_2": tag_2,
-                        "value": value,
-                    },
-                )
-                value_rubric = llm.structured_completion(
-                    messages=value_rubric_prompt,
-                    response_model=ValueRubric,
-                )
-                value_validations[value] = value_rubric
-                
-                if not value_rubric.overall_pass:
-                    if cfg.verbose:
-                        pretty_print_audit(value_rubric, value)
-                    value_adjustments.append(
-                        (value, value_rubric.failing_suggested_changes)
-                    )
-
-        # Attach validations to the latest record entry
-        case_record.refinement_history[-1].value_validations = value_validations
-
-        if value_adjustments:
-            value_improvements_prompt = pm.build_messages(
-                "workflows/improve_values",
-                {
-                    "old_vignette": draft.vignette,
-                    "old_choice_1": draft.choice_1,
-                    "old_choice_2": draft.choice_2,
-                    "value_adjustments": value_adjustments,
-                },
+    case_record.status = "completed"
+    
+    if cfg.verbose:
+        pretty_print_case(case_with_values, "FINAL CASE")
+    
+    # Save the complete case record
+    save_case_record(case_record)
+
+
+def generate_case(llm: LLM, pm: PromptManager, cfg: DictConfig) -> None:
+    """Generate, refine, tag and save a single case."""
+    draft, seed_context = get_seeded_draft(
+        llm, pm, cfg.seed_mode, cfg.max_synthetic_feasibility_attempts, cfg.verbose
+    )
+    case_record = start_case_record(cfg, draft, seed_context)
+
+    # todo: embedding based diversity gate
+
+    for i in range(cfg.refinement_iterations):
+        rubric_results = asyncio.run(run_rubrics(llm, pm, draft))
+        if record_rubrics(cfg, case_record, rubric_results):
+            # Every rubric passed; another refinement round would be wasted calls
+            break
+        draft = refine_draft(llm, pm, cfg, case_record, draft, i + 1)
+
+    case_with_values, value_tags = tag_values(llm, pm, cfg, case_record, draft)
+    value_validations = asyncio.run(run_value_rubrics(llm, pm, draft, value_tags))
+    finalize_case(llm, pm, cfg, case_record, draft, case_with_values, value_validations)
+
+
+async def generate_cases(llm: LLM, pm: PromptManager, cfg: DictConfig) -> None:
+    """
+    Generate cfg.num_cases cases concurrently, running at most
+    cfg.max_concurrent_cases of them at a time in worker threads.
+    """
+    semaphore = asyncio.Semaphore(cfg.max_concurrent_cases)
+    progress = tqdm(total=cfg.num_cases, desc="Generating cases")
+
+    async def worker() -> None:
+        async with semaphore:
+            await asyncio.to_thread(generate_case, llm, pm, cfg)
+        progress.update(1)
+
+    try:
+        await asyncio.gather(*(worker() for _ in range(cfg.num_cases)))
+    finally:
+        progress.close()
+
+
+def generate_cases_batched(llm: LLM, pm: PromptManager, cfg: DictConfig) -> None:
+    """
+    Generate cfg.num_cases cases stage by stage, sending every rubric and
+    value-rubric audit across all cases through one provider batch per stage.
+
+    Seeding, refinement, tagging and value improvements stay synchronous.
+    Batch results are matched back to cases by custom_id "<case_idx>:<name>".
+    """
+    runner = BatchRunner(llm, cfg.batch_provider, cfg.batch_poll_interval)
+
+    drafts, case_records = [], []
+    for _ in tqdm(range(cfg.num_cases), desc="Seeding cases"):
+        draft, seed_context = get_seeded_draft(
+            llm, pm, cfg.seed_mode, cfg.max_synthetic_feasibility_attempts, cfg.verbose
+        )
+        drafts.append(draft)
+        case_records.append(start_case_record(cfg, draft, seed_context))
+
+    # Cases drop out of refinement once all of their rubrics pass
+    refining = list(range(cfg.num_cases))
+    for i in range(cfg.refinement_iterations):
+        if not refining:
+            break
+        rubric_responses = runner.structured_completions({
+            f"{case_idx}:{name}": (
+                build_rubric_messages(pm, rubric_type, role_name, drafts[case_idx]),
+                rubric_type,
             )
-            case_with_values = llm.structured_completion(
-                messages=value_improvements_prompt,
-                response_model=BenchmarkCandidate,
+            for case_idx in refining
+            for name, rubric_type, role_name in RUBRIC_EVALUATORS
+        })
+        still_refining = []
+        for case_idx in tqdm(refining, desc=f"Refining cases (iter {i + 1})"):
+            rubric_results = []
+            for name, _, _ in RUBRIC_EVALUATORS:
+                rubric = rubric_responses[f"{case_idx}:{name}"]
+                rubric_results.append((rubric, rubric_feedback(rubric)))
+            if record_rubrics(cfg, case_records[case_idx], rubric_results):
+                continue
+            drafts[case_idx] = refine_draft(
+                llm, pm, cfg, case_records[case_idx], drafts[case_idx], i + 1
             )
-            
-            # Log the final improved version
-            case_record.refinement_history.append(IterationRecord(
-                iteration=cfg.refinement_iterations + 2,
-                step_description="final_improvement",
-                data=case_with_values
-            ))
-
-        case_record.status = "completed"
-        
-        if cfg.verbose:
-            pretty_print_case(case_with_values, "FINAL CASE")
-        
-        # Save the complete case record
-        save_case_record(case_record)
+            still_refining.append(case_idx)
+        refining = still_refining
 
+    tagged = [
+        tag_values(llm, pm, cfg, case_record, draft)
+        for case_record, draft in tqdm(
+            zip(case_records, drafts), total=cfg.num_cases, desc="Tagging values"
+        )
+    ]
 
-if __name__ == "__main__":
-    main()
+    value_responses = runner.structured_completions({
+        f"{case_idx}:{value}": (
+            build_value_rubric_messages(pm, drafts[case_idx], value, tag_1, tag_2),
+            ValueRubric,
+        )
+        for case_idx, (_, value_tags) in enumerate(tagged)
+        for value, (tag_1, tag_2) in value_tags.items()
+    })
+
+    for case_idx, (case_with_values, value_tags) in enumerate(tagged):
+        value_validations = {
+            value: value_responses[f"{case_idx}:{value}"] for value in value_tags
+        }
+        finalize_case(
+            llm, pm, cfg, case_records[case_idx], drafts[case_idx],
+            case_with_values, value_validations
+        )
+
+
+@hydra.main(version_base=None, config_path="config", config_name="generator")
+def main(cfg: DictConfig) -> None:
+    load_dotenv()
+
+    llm = LLM(cfg.model_name)
+    if cfg.requests_per_minute:
+        llm = RateLimitedLLM(llm, cfg.requests_per_minute)
+    if cfg.response_cache_path:
+        # Rubric audits are the only calls repeated with identical prompts
+        # worth reusing; generation steps must stay fresh for diversity.
+        llm = CachedLLM(
+            llm,
+            cfg.response_cache_path,
+            (ClinicalRubric, EthicalRubric, StylisticRubric, ValueRubric),
+        )
+    pm = PromptManager()
+
+    if cfg.batch_mode:
+        generate_cases_batched(llm, pm, cfg)
+        return
 
+    asyncio.run(generate_cases(llm, pm, cfg))
 
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,21 @@
+"""
+LLM Proxy Module
+
+Base class for wrappers that change how an LLM's calls are made (rate
+limiting, caching) while exposing the same interface as the LLM itself.
+"""
+
+from all_the_llms import LLM
+
+
+class LLMProxy:
+    """
+    Wraps an LLM and passes every attribute the subclass doesn't define
+    through to it, so wrappers can be stacked and used in place of an LLM.
+    """
+
+    def __init__(self, llm: LLM):
+        self._llm = llm
+
+    def __getattr__(self, name):
+        return getattr(self._llm, name)
@@ -1,39 +1,149 @@
 import os
-from jinja2 import Environment, FileSystemLoader
+import traceback
+from contextlib import contextmanager
+from functools import lru_cache
+from jinja2 import (
+    Environment,
+    FileSystemBytecodeCache,
+    FileSystemLoader,
+    StrictUndefined,
+    TemplateNotFound,
+    TemplateSyntaxError,
+    UndefinedError,
+    meta,
+)
+
+
+class PromptBuildError(RuntimeError):
+    """Raised when a prompt template can't be loaded or rendered."""
+
+
+def _template_location(error):
+    """The innermost template file and line in an error's traceback, if any."""
+    # Jinja rewrites tracebacks so template frames point at the .md source
+    for frame in reversed(traceback.extract_tb(error.__traceback__)):
+        if frame.filename.endswith(".md"):
+            return f"{frame.filename}, line {frame.lineno}"
+    return None
+
+
+@contextmanager
+def _prompt_errors(template_path):
+    """Re-raise Jinja errors as PromptBuildError with the template and line."""
+    try:
+        yield
+    except PromptBuildError:
+        raise
+    except TemplateNotFound as e:
+        raise PromptBuildError(f"Prompt template not found: {e.name}") from e
+    except TemplateSyntaxError as e:
+        raise PromptBuildError(
+            f"Syntax error in {e.name or template_path}, line {e.lineno}: {e.message}"
+        ) from e
+    except UndefinedError as e:
+        location = _template_location(e) or template_path
+        raise PromptBuildError(f"Error rendering {location}: {e.message}") from e
+    except Exception as e:
+        # Errors from expressions inside a template (e.g. adding a str to an int)
+        location = _template_location(e)
+        if location is None:
+            raise
+        raise PromptBuildError(f"Error rendering {location}: {e}") from e
+
 
 class PromptManager:
     def __init__(self, prompt_dir="src/prompts"):
         self.prompt_dir = prompt_dir
-        self.env = Environment(loader=FileSystemLoader(prompt_dir))
-    
+        # Templates don't change while a run is in progress, so skip the
+        # per-lookup mtime check and persist compiled bytecode across runs.
+        self.env = Environment(
+            loader=FileSystemLoader(prompt_dir),
+            auto_reload=False,
+            undefined=StrictUndefined,
+            cache_size=400,
+            bytecode_cache=FileSystemBytecodeCache(),
+        )
+        self.get_template = lru_cache(maxsize=None)(self.env.get_template)
+        self._has_system_prompt = lru_cache(maxsize=None)(self._system_prompt_exists)
+        self._template_variables = lru_cache(maxsize=None)(self._find_template_variables)
+        self._render_static = lru_cache(maxsize=None)(self._render_from_items)
+
+    def _system_prompt_exists(self, workflow_path):
+        """Check whether a workflow directory provides a system.md."""
+        return os.path.exists(os.path.join(self.prompt_dir, f"{workflow_path}/system.md"))
+
+    def _find_template_variables(self, template_path):
+        """
+        Names of the variables a template (including its includes) reads,
+        or None if that can't be determined statically.
+        """
+        source, _, _ = self.env.loader.get_source(self.env, template_path)
+        ast = self.env.parse(source)
+        names = set(meta.find_undeclared_variables(ast))
+        for included_path in meta.find_referenced_templates(ast):
+            included_names = None if included_path is None else self._template_variables(included_path)
+            if included_names is None:
+                return None
+            names |= included_names
+        return frozenset(names)
+
+    def _render_from_items(self, template_path, items):
+        return self.render(template_path, dict(items))
+
+    def render_cached(self, template_path, variables):
+        """
+        Render a template, memoizing the result on the variables it reads.
+
+        Useful for system prompts, which depend on few or no per-call
+        variables (e.g. the rubric system prompt only reads role_name and
+        rubric_criteria), so repeated builds become a cache lookup.
+        """
+        with _prompt_errors(template_path):
+            names = self._template_variables(template_path)
+        if names is None:
+            return self.render(template_path, variables)
+        items = tuple(sorted((name, variables[name]) for name in names if name in variables))
+        try:
+            hash(items)
+        except TypeError:
+            # Unhashable variable values can't be used as a cache key
+            return self.render(template_path, variables)
+        return self._render_static(template_path, items)
+
     def render(self, template_path, variables):
-        """Render a single template file with variables."""
-        template = self.env.get_template(template_path)
-        return template.render(**variables)
-    
+        """
+        Render a single template file with variables.
+
+        Raises:
+            PromptBuildError: If the template is missing, malformed, or reads
+                a variable that wasn't provided
+        """
+        with _prompt_errors(template_path):
+            template = self.get_template(template_path)
+            return template.render(**variables)
+
     def build_messages(self, workflow_path, variables):
         """
         Build a messages list from a workflow directory.
-        
+
         Expects:
           - {workflow_path}/system.md  (optional)
           - {workflow_path}/user.md    (required)
         """
         messages = []
-        
+
         # System message (optional)
-        system_path = f"{workflow_path}/system.md"
-        if os.path.exists(os.path.join(self.prompt_dir, system_path)):
+        if self._has_system_prompt(workflow_path):
             messages.append({
                 "role": "system",
-                "content": self.render(system_path, variables)
+                "content": self.render_cached(f"{workflow_path}/system.md", variables)
             })
-        
+
         # User message (required)
         user_path = f"{workflow_path}/user.md"
         messages.append({
-            "role": "user", 
+            "role": "user",
             "content": self.render(user_path, variables)
         })
-        
+
         return messages
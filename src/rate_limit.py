@@ -0,0 +1,47 @@
+"""
+Rate Limit Module
+
+Keeps LLM calls made from many worker threads under a provider's
+requests-per-minute limit.
+"""
+
+import threading
+import time
+from collections import deque
+
+from all_the_llms import LLM
+
+from src.llm_proxy import LLMProxy
+
+
+class RateLimitedLLM(LLMProxy):
+    """
+    Keeps structured_completion calls, from any thread, within a sliding
+    one-minute request budget.
+
+    Attributes:
+        requests_per_minute: Maximum calls started in any 60 second window
+    """
+
+    def __init__(self, llm: LLM, requests_per_minute: int):
+        super().__init__(llm)
+        self.requests_per_minute = requests_per_minute
+        self._lock = threading.Lock()
+        self._call_times = deque()
+
+    def structured_completion(self, *args, **kwargs):
+        self._acquire()
+        return self._llm.structured_completion(*args, **kwargs)
+
+    def _acquire(self) -> None:
+        """Block until a call can start without exceeding the budget."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                while self._call_times and now - self._call_times[0] >= 60:
+                    self._call_times.popleft()
+                if len(self._call_times) < self.requests_per_minute:
+                    self._call_times.append(now)
+                    return
+                wait = 60 - (now - self._call_times[0])
+            time.sleep(wait)
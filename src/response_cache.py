@@ -0,0 +1,95 @@
+"""
+Response Cache Module
+
+Persists structured completions on disk so identical requests (same
+messages, model and response schema) are answered without an LLM call.
+Only deterministic audits should be cached: caching generation steps would
+return the same draft for every repeated seed.
+"""
+
+import json
+import sqlite3
+from contextlib import closing
+from hashlib import blake2b
+from pathlib import Path
+from typing import Optional, Tuple, Type
+
+from all_the_llms import LLM
+from pydantic import BaseModel
+
+from src.llm_proxy import LLMProxy
+
+
+class CachedLLM(LLMProxy):
+    """
+    Answers repeated structured_completion requests from a SQLite cache.
+
+    Attributes:
+        cache_path: Path to the SQLite cache file
+        cached_models: Response models whose completions are cached; calls
+            for any other model always go to the wrapped LLM
+    """
+
+    def __init__(self, llm: LLM, cache_path: str, cached_models: Tuple[Type[BaseModel], ...]):
+        super().__init__(llm)
+        self.cache_path = Path(cache_path)
+        self.cached_models = cached_models
+
+        self.cache_path.parent.mkdir(exist_ok=True, parents=True)
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, response TEXT NOT NULL)"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        # One short-lived connection per operation keeps the cache safe to use
+        # from the generator's worker threads
+        return sqlite3.connect(self.cache_path, timeout=30)
+
+    def _cache_key(self, messages: list[dict], response_model: Type[BaseModel], options: dict) -> str:
+        request = {
+            "messages": messages,
+            "model": self._llm.model_name,
+            "schema": response_model.model_json_schema(),
+        }
+        # Sampling options (temperature etc.) change the response, so they
+        # are part of the key; omitted when empty to keep older keys valid
+        if options:
+            request["options"] = options
+        payload = json.dumps(request, sort_keys=True, default=str)
+        return blake2b(payload.encode("utf-8")).hexdigest()
+
+    def _get(self, key: str) -> Optional[str]:
+        with closing(self._connect()) as conn, conn:
+            row = conn.execute("SELECT response FROM responses WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _put(self, key: str, response: str) -> None:
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (key, response) VALUES (?, ?)",
+                (key, response),
+            )
+
+    def lookup(self, messages: list[dict], response_model: Type[BaseModel], **kwargs) -> Optional[BaseModel]:
+        """Return the cached response for a request, or None if there isn't one."""
+        if response_model not in self.cached_models:
+            return None
+        cached = self._get(self._cache_key(messages, response_model, kwargs))
+        return None if cached is None else response_model.model_validate_json(cached)
+
+    def store(self, messages: list[dict], response_model: Type[BaseModel], response: BaseModel, **kwargs) -> None:
+        """Cache a response obtained outside structured_completion (e.g. from a batch)."""
+        if response_model in self.cached_models:
+            self._put(self._cache_key(messages, response_model, kwargs), response.model_dump_json())
+
+    def structured_completion(self, messages: list[dict], response_model: Type[BaseModel], **kwargs):
+        cached = self.lookup(messages, response_model, **kwargs)
+        if cached is not None:
+            return cached
+
+        response = self._llm.structured_completion(
+            messages=messages, response_model=response_model, **kwargs
+        )
+        self.store(messages, response_model, response, **kwargs)
+        return response
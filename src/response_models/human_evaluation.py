@@ -4,8 +4,8 @@ Human Evaluation Models
 Pydantic models for human evaluation sessions and case evaluations.
 """
 
-from pydantic import BaseModel
-from typing import Optional, Set
+from pydantic import BaseModel, ConfigDict
+from typing import Any, Dict, Optional, Set
 
 from src.response_models.case import BenchmarkCandidate
 
@@ -38,9 +38,18 @@ class UserSession(BaseModel):
     last_updated: str
     reviewed_case_ids: Set[str] = set()  # Just track IDs, not full data
     
-    class Config:
-        # Allow set type in JSON schema
-        json_schema_extra = {
+    # Decision and has_edits per reviewed case, kept so statistics don't
+    # require loading case records
+    review_outcomes: Dict[str, Dict[str, Any]] = {}
+    review_timestamps: Dict[str, str] = {}  # Latest review time per case ID
+    approved: int = 0
+    rejected: int = 0
+    with_edits: int = 0
+    
+    # Allow set type in JSON schema
+    model_config = ConfigDict(
+        json_schema_extra={
             "reviewed_case_ids": {"type": "array", "items": {"type": "string"}}
         }
+    )
 
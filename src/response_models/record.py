@@ -70,7 +70,8 @@ class CaseRecord(BaseModel):
         decision: str,
         evaluator: str,
         updated_case: Optional[BenchmarkCandidate] = None,
-        notes: Optional[str] = None
+        notes: Optional[str] = None,
+        timestamp: Optional[str] = None
     ) -> None:
         """
         Add a human evaluation iteration to the case record.
@@ -80,6 +81,7 @@ class CaseRecord(BaseModel):
             evaluator: Username of the evaluator
             updated_case: Optional edited version of the case
             notes: Optional evaluation notes
+            timestamp: ISO timestamp to record as evaluated_at (defaults to now)
             
         Raises:
             ValueError: If case has no final version or already evaluated
@@ -102,19 +104,23 @@ class CaseRecord(BaseModel):
         # Use edited case if provided, otherwise use current
         final_case = updated_case if updated_case else current_case
         iteration_num = len(self.refinement_history)
+        evaluated_at = timestamp or datetime.now().isoformat()
         
         evaluation_metadata = {
             "decision": decision,
             "evaluator": evaluator,
             "notes": notes,
             "has_edits": updated_case is not None,
-            "evaluated_at": datetime.now().isoformat()
+            "evaluated_at": evaluated_at,
+            # Index of the version that was evaluated (the last non-evaluation
+            # iteration, since duplicate evaluations are rejected above)
+            "pre_evaluation_index": iteration_num - 1
         }
         
         new_iteration = IterationRecord(
             iteration=iteration_num,
             step_description="human_evaluation",
-            timestamp=datetime.now(),
+            timestamp=datetime.fromisoformat(evaluated_at),
             data=final_case,
             human_evaluation=evaluation_metadata
         )
@@ -135,6 +141,38 @@ class CaseRecord(BaseModel):
                 }
         return None
     
+    def get_pre_evaluation_index(self, evaluation: Dict[str, Any]) -> Optional[int]:
+        """
+        Get the refinement_history index of the version a human evaluation was performed on.
+        
+        Evaluations store this index when they are added. For records written
+        before that, it is found by scanning back for the last non-evaluation
+        iteration once and memoized on the evaluation metadata.
+        
+        Args:
+            evaluation: An evaluation dict from get_latest_evaluation() or
+                get_evaluation_history()
+        
+        Returns:
+            The index, or None if no earlier non-evaluation iteration exists
+        """
+        if evaluation.get("pre_evaluation_index") is not None:
+            return evaluation["pre_evaluation_index"]
+        
+        eval_iteration = evaluation["iteration"]
+        pre_evaluation_index = None
+        for i in range(min(eval_iteration, len(self.refinement_history)) - 1, -1, -1):
+            if self.refinement_history[i].step_description != "human_evaluation":
+                pre_evaluation_index = i
+                break
+        
+        if pre_evaluation_index is not None and eval_iteration < len(self.refinement_history):
+            human_evaluation = self.refinement_history[eval_iteration].human_evaluation
+            if human_evaluation is not None:
+                human_evaluation["pre_evaluation_index"] = pre_evaluation_index
+        evaluation["pre_evaluation_index"] = pre_evaluation_index
+        return pre_evaluation_index
+    
     def get_evaluation_history(self) -> List[Dict[str, Any]]:
         """Get all human evaluations performed on this case."""
         evaluations = []
@@ -4,6 +4,7 @@ import textwrap
 import json
 import os
 from datetime import datetime
+from functools import lru_cache
 
 
 def save_case_record(record, output_dir: str = "data/cases"):
@@ -23,23 +24,17 @@ def save_case_record(record, output_dir: str = "data/cases"):
     print(f"\n[SYSTEM] Case record saved to {filepath}")
 
 
-def evaluate_rubric(llm, pm, rubric_type: Type[BaseModel], role_name: str, draft) -> tuple[BaseModel, str]:
+def build_rubric_messages(pm, rubric_type: Type[BaseModel], role_name: str, draft) -> list[dict]:
     """
-    Evaluate a case against a specific rubric.
+    Build the messages for auditing a case against a specific rubric.
     
     Args:
-        llm: Language model instance for structured completion
         pm: PromptManager instance for building messages
         rubric_type: The rubric model class (e.g., ClinicalRubric, EthicalRubric)
         role_name: The role description for the evaluator
         draft: The case to evaluate (must have vignette, choice_1, choice_2 attributes)
-    
-    Returns:
-        A tuple of (rubric, feedback) where:
-        - rubric: An instance of rubric_type with the evaluation results
-        - feedback: String with suggested changes or "No issues detected."
     """
-    rubric_prompt = pm.build_messages(
+    return pm.build_messages(
         "workflows/rubric",
         {
             "role_name": role_name,
@@ -49,20 +44,41 @@ def evaluate_rubric(llm, pm, rubric_type: Type[BaseModel], role_name: str, draft
             "choice_2": draft.choice_2,
         },
     )
-    rubric = llm.structured_completion(
-        messages=rubric_prompt,
-        response_model=rubric_type,
-    )
-    
-    feedback = (
+
+
+def rubric_feedback(rubric) -> str:
+    """Return a rubric's suggested changes, or "No issues detected." if it passed."""
+    return (
         rubric.all_suggested_changes
         if not rubric.overall_pass
         else "No issues detected."
     )
+
+
+def evaluate_rubric(llm, pm, rubric_type: Type[BaseModel], role_name: str, draft) -> tuple[BaseModel, str]:
+    """
+    Evaluate a case against a specific rubric.
+    
+    Args:
+        llm: Language model instance for structured completion
+        pm: PromptManager instance for building messages
+        rubric_type: The rubric model class (e.g., ClinicalRubric, EthicalRubric)
+        role_name: The role description for the evaluator
+        draft: The case to evaluate (must have vignette, choice_1, choice_2 attributes)
     
-    return rubric, feedback
+    Returns:
+        A tuple of (rubric, feedback) where:
+        - rubric: An instance of rubric_type with the evaluation results
+        - feedback: String with suggested changes or "No issues detected."
+    """
+    rubric = llm.structured_completion(
+        messages=build_rubric_messages(pm, rubric_type, role_name, draft),
+        response_model=rubric_type,
+    )
+    return rubric, rubric_feedback(rubric)
 
 
+@lru_cache(maxsize=None)
 def format_criteria(model: Type[BaseModel]) -> str:
     """
     Converts a Pydantic model's fields into a clean Markdown checklist.